@@ -4,15 +4,18 @@ __email__ = "johannes.koester@uni-due.de"
 __license__ = "MIT"
 
 import asyncio
+import errno
 import os
 import base64
 import tempfile
 import json
 import shutil
+import stat
 
-from itertools import chain, filterfalse
-from operator import attrgetter
+from itertools import chain, islice
+from operator import attrgetter, itemgetter
 from typing import Optional
+from weakref import WeakValueDictionary
 from collections.abc import AsyncGenerator
 from abc import ABC, abstractmethod
 from snakemake.settings import DeploymentMethod
@@ -27,6 +30,7 @@ from snakemake_interface_executor_plugins.settings import ExecMode
 
 from snakemake.io import (
     _IOFile,
+    AnnotatedStringInterface,
     IOFile,
     is_callable,
     Wildcards,
@@ -50,17 +54,25 @@ from snakemake.common import (
 from snakemake.common.tbdstring import TBDString
 
 
+# Formatting of files that carry one of the given flags, in order of precedence.
+# Each formatter receives the file and the value of the flag.
+FLAG_FORMATTERS = {
+    "pipe": lambda f, value: f"{f} (pipe)",
+    "service": lambda f, value: f"{f} (service)",
+    "checkpoint_target": lambda f, value: TBDString(),
+    "sourcecache_entry": lambda f, orig_path_or_uri: f"{orig_path_or_uri} (cached)",
+}
+
+
 def format_file(f, is_input: bool):
-    if is_flagged(f, "pipe"):
-        return f"{f} (pipe)"
-    elif is_flagged(f, "service"):
-        return f"{f} (service)"
-    elif is_flagged(f, "checkpoint_target"):
-        return TBDString()
-    elif is_flagged(f, "sourcecache_entry"):
-        orig_path_or_uri = get_flag_value(f, "sourcecache_entry")
-        return f"{orig_path_or_uri} (cached)"
-    elif f.is_storage:
+    # obtain the flags only once instead of querying each one via is_flagged
+    flags = f.flags if isinstance(f, AnnotatedStringInterface) else None
+    if flags:
+        for flag, formatter in FLAG_FORMATTERS.items():
+            value = flags.get(flag)
+            if value:
+                return formatter(f, value)
+    if f.is_storage:
         phrase = "retrieve from" if is_input else "send to"
         return f"{f.storage_object.query} ({phrase} storage)"
     else:
@@ -71,10 +83,109 @@ def format_files(io, is_input: bool):
     return [format_file(f, is_input=is_input) for f in io]
 
 
+def has_format_fields(string):
+    """Return True if the given string needs formatting.
+
+    Note that escaped braces (e.g. "}}") need formatting as well.
+    """
+    return "{" in string or "}" in string
+
+
 def jobfiles(jobs, type):
     return chain(*map(attrgetter(type), jobs))
 
 
+def split_storage(files):
+    """Split the given files into a list of local and a list of storage files."""
+    local, storage = [], []
+    add_local, add_storage = local.append, storage.append
+    for f in files:
+        if f.is_storage:
+            add_storage(f)
+        else:
+            add_local(f)
+    return local, storage
+
+
+def copy_file(src, dst):
+    """Copy the content and permission bits of file src to dst.
+
+    Where available (Linux), os.copy_file_range lets the kernel copy the data
+    of regular files without passing it through user space, or even share it
+    via reflinks on filesystems that support this. Otherwise, shutil.copy is
+    used.
+    """
+    src_stat = os.stat(src)
+    if hasattr(os, "copy_file_range") and stat.S_ISREG(src_stat.st_mode):
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            infd, outfd = fsrc.fileno(), fdst.fileno()
+            blocksize = min(max(src_stat.st_size, 2**23), 2**30)
+            offset = 0
+            try:
+                while True:
+                    copied = os.copy_file_range(infd, outfd, blocksize)
+                    if not copied:
+                        break
+                    offset += copied
+            except OSError as e:
+                # Like shutil, fall back as long as nothing has been copied, since
+                # copy_file_range can fail for all kinds of reasons (e.g. not being
+                # supported by the kernel or filesystem, being used across
+                # filesystems, or being blocked by a seccomp filter).
+                if e.errno == errno.ENOSPC or offset != 0:
+                    raise
+            else:
+                # Also like shutil, do not trust a copy of nothing at all, since
+                # some filesystems (e.g. procfs, some FUSE or NFS setups) silently
+                # do not copy anything.
+                if offset != 0:
+                    shutil.copymode(src, dst)
+                    return
+    shutil.copy(src, dst)
+
+
+async def create_symlinks(links, chunksize=64):
+    """Create the given (source, link) symlinks.
+
+    The calls are issued concurrently from worker threads in chunks, such that
+    their latency (e.g. on network filesystems) overlaps instead of adding up.
+    Each chunk is completed before an error is raised, and no further links
+    are created afterwards.
+    """
+    links = iter(links)
+    while True:
+        chunk = list(islice(links, chunksize))
+        if not chunk:
+            return
+        results = await asyncio.gather(
+            *(asyncio.to_thread(os.symlink, source, link) for source, link in chunk),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+
+# Scheduler resources are never modified and usually identical for many jobs
+# (e.g. all jobs of the same rule). Hence, they are shared between jobs.
+_shared_resources = WeakValueDictionary()
+
+
+def shared_resources(resources: dict) -> Resources:
+    """Return a Resources object for the given dict, reusing an existing
+    equal one if possible."""
+    key = tuple(resources.items())
+    try:
+        shared = _shared_resources.get(key)
+    except TypeError:
+        # unhashable resource values cannot be shared
+        return Resources(fromdict=resources)
+    if shared is None:
+        shared = Resources(fromdict=resources)
+        _shared_resources[key] = shared
+    return shared
+
+
 class AbstractJob(JobExecutorInterface):
     @abstractmethod
     def reset_params_and_resources(self):
@@ -96,24 +207,16 @@ class AbstractJob(JobExecutorInterface):
     def _get_scheduler_resources(self):
         if self._scheduler_resources is None:
             if self.dag.workflow.local_exec or self.is_local:
-                self._scheduler_resources = Resources(
-                    fromdict={
-                        k: v
-                        for k, v in self.resources.items()
-                        if not isinstance(self.resources[k], TBDString)
-                    }
-                )
+                skip = frozenset()
             else:
-                self._scheduler_resources = Resources(
-                    fromdict={
-                        k: self.resources[k]
-                        for k in (
-                            set(self.resources.keys())
-                            - self.dag.workflow.resource_scopes.locals
-                        )
-                        if not isinstance(self.resources[k], TBDString)
-                    }
-                )
+                skip = self.dag.workflow.resource_scopes.locals
+            self._scheduler_resources = shared_resources(
+                {
+                    k: v
+                    for k, v in self.resources.items()
+                    if k not in skip and not isinstance(v, TBDString)
+                }
+            )
         return self._scheduler_resources
 
 
@@ -131,16 +234,17 @@ class JobFactory:
         update=False,
         groupid=None,
     ):
-        key = (rule.name, *sorted(wildcards_dict.items()))
+        # wildcard names are unique, hence a frozenset identifies the job
+        # as well as a sorted tuple would, without the need to sort
+        key = (rule.name, frozenset(wildcards_dict.items()))
         if update:
             # cache entry has to be replaced because job shall be constructed from scratch
             obj = Job(rule, dag, wildcards_dict, format_wildcards, targetfile, groupid)
             self.cache[key] = obj
         else:
-            try:
-                # try to get job from cache
-                obj = self.cache[key]
-            except KeyError:
+            # try to get job from cache
+            obj = self.cache.get(key)
+            if obj is None:
                 obj = Job(rule, dag, wildcards_dict, format_wildcards, targetfile)
                 self.cache[key] = obj
         return obj
@@ -175,6 +279,19 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         "targetfile",
         "incomplete_input_expand",
         "_params_and_resources_resetted",
+        "_is_local",
+        "_is_run",
+        "_is_pipe",
+        "_is_service",
+        "_container_img",
+        "_b64id",
+        "_local_input",
+        "_storage_input",
+        "_local_output",
+        "_storage_output",
+        "_wait_for_input_files",
+        "_uuid",
+        "_products",
     ]
 
     def __init__(
@@ -205,7 +322,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
 
         (
             self.input,
-            input_mapping,
+            _,
             self.dependencies,
             self.incomplete_input_expand,
         ) = self.rule.expand_input(self.wildcards_dict, groupid=groupid)
@@ -226,24 +343,27 @@ class Job(AbstractJob, SingleJobExecutorInterface):
 
         self.shadow_dir = None
         self._inputsize = None
+        self._local_input = None
+        self._storage_input = None
+        self._local_output = None
+        self._storage_output = None
+        self._wait_for_input_files = None
+        self._uuid = None
+        self._products = None
         self._is_updated = False
         self._params_and_resources_resetted = False
 
         self._attempt = self.dag.workflow.attempt
 
         # TODO get rid of these
-        self.temp_output, self.protected_output = set(), set()
-        self.touch_output = set()
-        for f in self.output:
-            f_ = output_mapping[f]
-            if f_ in self.rule.temp_output:
-                self.temp_output.add(f)
-            if f_ in self.rule.protected_output:
-                self.protected_output.add(f)
-            if f_ in self.rule.touch_output:
-                self.touch_output.add(f)
-        for f in self.input:
-            f_ = input_mapping[f]
+        def flagged_output(rule_output):
+            if not rule_output:
+                return set()
+            return {f for f in self.output if output_mapping[f] in rule_output}
+
+        self.temp_output = flagged_output(self.rule.temp_output)
+        self.protected_output = flagged_output(self.rule.protected_output)
+        self.touch_output = flagged_output(self.rule.touch_output)
 
     @property
     def is_updated(self):
@@ -287,18 +407,11 @@ class Job(AbstractJob, SingleJobExecutorInterface):
 
     def logfile_suggestion(self, prefix: str) -> str:
         """Return a suggestion for the log file name given a prefix."""
-        return (
-            "/".join(
-                [prefix, self.rule.name]
-                + [
-                    f"{w}_{v}"
-                    for w, v in sorted(
-                        self.wildcards_dict.items(), key=lambda item: item[0]
-                    )
-                ]
-            )
-            + ".log"
+        wildcards = "".join(
+            f"/{w}_{v}"
+            for w, v in sorted(self.wildcards_dict.items(), key=itemgetter(0))
         )
+        return f"{prefix}/{self.rule.name}{wildcards}.log"
 
     def updated(self):
         group = self.dag.get_job_group(self)
@@ -469,7 +582,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
     def is_containerized(self):
         return self.rule.is_containerized
 
-    @property
+    @lazy_property
     def container_img(self):
         if (
             DeploymentMethod.APPTAINER
@@ -495,11 +608,11 @@ class Job(AbstractJob, SingleJobExecutorInterface):
     def priority(self):
         return self.dag.priority(self)
 
-    @property
+    @lazy_property
     def b64id(self):
         return base64.b64encode(
-            (self.rule.name + "".join(self.output)).encode("utf-8")
-        ).decode("utf-8")
+            "".join((self.rule.name, *self.output)).encode("utf-8")
+        ).decode("ascii")
 
     async def inputsize(self):
         """
@@ -507,7 +620,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         Input files need to be present.
         """
         if self._inputsize is None:
-            self._inputsize = sum([await f.size() for f in self.input])
+            self._inputsize = sum(await asyncio.gather(*(f.size() for f in self.input)))
         return self._inputsize
 
     @property
@@ -570,7 +683,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
     def is_template_engine(self):
         return self.rule.is_template_engine
 
-    @property
+    @lazy_property
     def is_run(self):
         return not (
             self.is_shell
@@ -581,11 +694,11 @@ class Job(AbstractJob, SingleJobExecutorInterface):
             or self.is_cwl
         )
 
-    @property
+    @lazy_property
     def is_pipe(self):
         return any(is_flagged(o, "pipe") for o in self.output)
 
-    @property
+    @lazy_property
     def is_service(self):
         return any(is_flagged(o, "service") for o in self.output)
 
@@ -610,12 +723,11 @@ class Job(AbstractJob, SingleJobExecutorInterface):
 
         async with asyncio.TaskGroup() as tg:
             tasks = [tg.create_task(get_mtime(f)) for f in self.output]
-        mintimes = list(
-            filter(lambda res: res is not None, (task.result() for task in tasks))
+        mintime = min(
+            (mtime for mtime in (task.result() for task in tasks) if mtime is not None),
+            default=None,
         )
 
-        mintime = min(mintimes) if mintimes else None
-
         if self.benchmark and await self.benchmark.exists():
             mintime_benchmark = (await self.benchmark.mtime()).local_or_storage()
             if mintime is not None:
@@ -626,55 +738,54 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         return mintime
 
     async def missing_output(self, requested):
-        async def handle_file(f):
+        requested = list(requested)
+        async with asyncio.TaskGroup() as tg:
             # pipe or service output is always declared as missing
-            # (even if it might be present on disk for some reason)
-            if (
-                is_flagged(f, "pipe")
-                or is_flagged(f, "service")
-                or not await f.exists()
-            ):
-                yield f
-
-        for f in requested:
-            async for f in handle_file(f):
+            # (even if it might be present on disk for some reason),
+            # hence only the other files need to be checked
+            tasks = [
+                None
+                if is_flagged(f, "pipe") or is_flagged(f, "service")
+                else tg.create_task(f.exists())
+                for f in requested
+            ]
+        for f, task in zip(requested, tasks):
+            if task is None or not task.result():
                 yield f
 
     @property
     def local_input(self):
-        for f in self.input:
-            if not f.is_storage:
-                yield f
+        if self._local_input is None:
+            self._local_input, self._storage_input = split_storage(self.input)
+        return self._local_input
 
     @property
     def unique_input(self):
-        seen = set()
-
-        for element in filterfalse(seen.__contains__, self.input):
-            seen.add(element)
-            yield element
+        yield from dict.fromkeys(self.input)
 
     @property
     def local_output(self):
-        for f in self.output:
-            if not f.is_storage:
-                yield f
+        if self._local_output is None:
+            self._local_output, self._storage_output = split_storage(self.output)
+        return self._local_output
 
     @property
     def storage_input(self):
-        for f in self.input:
-            if f.is_storage:
-                yield f
+        if self._storage_input is None:
+            self._local_input, self._storage_input = split_storage(self.input)
+        return self._storage_input
 
     @property
     def storage_output(self):
-        for f in self.output:
-            if f.is_storage:
-                yield f
+        if self._storage_output is None:
+            self._local_output, self._storage_output = split_storage(self.output)
+        return self._storage_output
 
     async def existing_output(self) -> AsyncGenerator[_IOFile, None]:
-        for f in self.output:
-            if await f.exists():
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(f.exists()) for f in self.output]
+        for f, task in zip(self.output, tasks):
+            if task.result():
                 yield f
 
     async def check_protected_output(self):
@@ -757,15 +868,15 @@ class Job(AbstractJob, SingleJobExecutorInterface):
             self.rule.shadow_depth == "minimal"
             or self.rule.shadow_depth == "copy-minimal"
         ):
-            # Re-create the directory structure in the shadow directory
-            for f, d in set(
-                [
-                    (item, os.path.dirname(item))
-                    for sublist in [self.input, self.output, self.log]
-                    if sublist is not None
-                    for item in sublist
-                ]
-            ):
+            # Re-create the directory structure in the shadow directory.
+            # Each directory is only handled once, remembering the first file
+            # located in it for error reporting.
+            dirs = dict()
+            for sublist in [self.input, self.output, self.log]:
+                if sublist is not None:
+                    for f in sublist:
+                        dirs.setdefault(os.path.dirname(f), f)
+            for d, f in dirs.items():
                 if d and not os.path.isabs(d):
                     rel_path = os.path.relpath(d)
                     # Only create subdirectories
@@ -783,61 +894,72 @@ class Job(AbstractJob, SingleJobExecutorInterface):
                         )
 
             # Symlink or copy the input files
+            rel_inputs = dict.fromkeys(
+                os.path.relpath(f) for f in self.input if not os.path.isabs(f)
+            )
             if self.rule.shadow_depth == "copy-minimal":
-                for rel_path in set(
-                    [os.path.relpath(f) for f in self.input if not os.path.isabs(f)]
-                ):
+                for rel_path in rel_inputs:
                     copy = os.path.join(self.shadow_dir, rel_path)
-                    shutil.copy(rel_path, copy)
+                    copy_file(rel_path, copy)
             else:
-                for rel_path in set(
-                    [os.path.relpath(f) for f in self.input if not os.path.isabs(f)]
-                ):
+                links = []
+                for rel_path in rel_inputs:
                     link = os.path.join(self.shadow_dir, rel_path)
                     original = os.path.relpath(rel_path, os.path.dirname(link))
-                    os.symlink(original, link)
+                    links.append((original, link))
+                await create_symlinks(links)
 
         # Shallow simply symlink everything in the working directory.
         elif self.rule.shadow_depth == "shallow":
-            for source in os.listdir(cwd):
-                link = os.path.join(self.shadow_dir, source)
-                os.symlink(os.path.abspath(source), link)
+            await create_symlinks(
+                (os.path.abspath(source), os.path.join(self.shadow_dir, source))
+                for source in os.listdir(cwd)
+            )
         elif self.rule.shadow_depth == "full":
-            snakemake_dir = os.path.join(cwd, ".snakemake")
-            for dirpath, dirnames, filenames in os.walk(cwd, followlinks=True):
-                # a link should not point to a parent directory of itself, else can cause infinite recursion
-                # Must exclude .snakemake and its children to avoid infinite
-                # loop of symlinks.
-                if os.path.commonprefix([snakemake_dir, dirpath]) == snakemake_dir:
+            # Traverse the working directory depth-first via os.scandir, which
+            # provides the type of each entry without additional stat calls.
+            # Directories are created right away, since links are placed inside.
+            links = []
+            stack = [(cwd, self.shadow_dir)]
+            while stack:
+                dirpath, shadow_dirpath = stack.pop()
+                try:
+                    entries = os.scandir(dirpath)
+                except OSError:
+                    # unreadable directories are skipped, as os.walk would do
                     continue
-                for dirname in dirnames:
-                    if dirname == ".snakemake":
-                        continue
-                    relative_source = os.path.relpath(os.path.join(dirpath, dirname))
-                    shadow = os.path.join(self.shadow_dir, relative_source)
-                    os.mkdir(shadow)
-
-                for filename in filenames:
-                    source = os.path.join(dirpath, filename)
-                    relative_source = os.path.relpath(source)
-                    link = os.path.join(self.shadow_dir, relative_source)
-                    os.symlink(source, link)
+                with entries:
+                    for entry in entries:
+                        shadow = os.path.join(shadow_dirpath, entry.name)
+                        # symlinks to directories are followed
+                        if entry.is_dir():
+                            # Must exclude .snakemake and its children to avoid
+                            # infinite loop of symlinks.
+                            if entry.name == ".snakemake":
+                                continue
+                            os.mkdir(shadow)
+                            stack.append((entry.path, shadow))
+                        else:
+                            links.append((entry.path, shadow))
+            await create_symlinks(links)
 
     async def cleanup(self):
         """Cleanup output files."""
-        to_remove = [f for f in self.output if await f.exists()]
 
-        to_remove.extend(
-            [
-                f
-                for f in self.storage_output
-                if (
-                    await f.exists_in_storage()
-                    if (f.is_storage and f.should_not_be_retrieved_from_storage)
-                    else await f.exists_local()
-                )
-            ]
-        )
+        async def is_present(f):
+            if await f.exists():
+                return True
+            # storage output that is retrieved might be present locally only
+            return (
+                f.is_storage
+                and not f.should_not_be_retrieved_from_storage
+                and await f.exists_local()
+            )
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(is_present(f)) for f in self.output]
+        to_remove = [f for f, task in zip(self.output, tasks) if task.result()]
+
         if to_remove:
             logger.info(
                 "Removing output files of failed job {}"
@@ -848,25 +970,24 @@ class Job(AbstractJob, SingleJobExecutorInterface):
 
     def format_wildcards(self, string, **variables):
         """Format a string with variables from the job."""
-        _variables = dict()
-        _variables.update(self.rule.workflow.globals)
-        _variables.update(
-            dict(
-                input=self.input,
-                output=self.output,
-                params=self.params,
-                wildcards=self._format_wildcards,
-                threads=self.threads,
-                resources=self.resources,
-                log=self.log,
-                jobid=self.jobid,
-                name=self.name,
-                rule=self.rule.name,
-                rulename=self.rule.name,
-                bench_iteration=None,
-            )
-        )
-        _variables.update(variables)
+        if not has_format_fields(string):
+            return string
+        _variables = {
+            **self.rule.workflow.globals,
+            "input": self.input,
+            "output": self.output,
+            "params": self.params,
+            "wildcards": self._format_wildcards,
+            "threads": self.threads,
+            "resources": self.resources,
+            "log": self.log,
+            "jobid": self.jobid,
+            "name": self.name,
+            "rule": self.rule.name,
+            "rulename": self.rule.name,
+            "bench_iteration": None,
+            **variables,
+        }
         try:
             return format(string, **_variables)
         except Exception as ex:
@@ -882,7 +1003,6 @@ class Job(AbstractJob, SingleJobExecutorInterface):
             for name, res in self.resources.items()
             if name not in omit_resources
         }
-        params = {name: value for name, value in self.params.items()}
         properties = {
             "type": "single",
             "rule": self.rule.name,
@@ -890,7 +1010,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
             "input": None if len(self.input) > IO_PROP_LIMIT else self.input,
             "output": None if len(self.output) > IO_PROP_LIMIT else self.output,
             "wildcards": self.wildcards_dict,
-            "params": params,
+            "params": dict(self.params.items()),
             "log": self.log,
             "threads": self.threads,
             "resources": resources,
@@ -904,7 +1024,7 @@ class Job(AbstractJob, SingleJobExecutorInterface):
             del properties["params"]
             return json.dumps(properties)
 
-    @property
+    @lazy_property
     def is_local(self):
         no_shared_fs = (
             SharedFSUsage.INPUT_OUTPUT
@@ -984,11 +1104,15 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         self.dag.workflow.persistence.started(self, external_jobid)
 
     def get_wait_for_files(self):
-        wait_for_files = []
-        wait_for_files.extend(self.local_input)
-        wait_for_files.extend(
-            f for f in self.storage_input if not f.should_not_be_retrieved_from_storage
-        )
+        # Input files are fixed, hence they are only collected once.
+        # Shadow dir and conda env however become available later.
+        if self._wait_for_input_files is None:
+            self._wait_for_input_files = self.local_input + [
+                f
+                for f in self.storage_input
+                if not f.should_not_be_retrieved_from_storage
+            ]
+        wait_for_files = list(self._wait_for_input_files)
 
         if self.shadow_dir:
             wait_for_files.append(self.shadow_dir)
@@ -1009,11 +1133,14 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         return self.dag.jobid(self)
 
     def uuid(self):
-        return str(
-            get_uuid(
-                f"{self.rule.name}:{','.join(sorted(f'{w}:{v}' for w, v in self.wildcards_dict.items()))}"
+        if self._uuid is None:
+            # The name format must not change, since it determines the uuid and
+            # hence the ids of group jobs.
+            wildcards = ",".join(
+                sorted(f"{w}:{v}" for w, v in self.wildcards_dict.items())
             )
-        )
+            self._uuid = str(get_uuid(f"{self.rule.name}:{wildcards}"))
+        return self._uuid
 
     async def postprocess(
         self,
@@ -1023,49 +1150,51 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         error=False,
         ignore_missing_output=False,
     ):
-        if self.dag.is_edit_notebook_job(self):
+        dag = self.dag
+        workflow = dag.workflow
+        if dag.is_edit_notebook_job(self):
             # No postprocessing necessary, we have just created the skeleton notebook and
             # execution will anyway stop afterwards.
             return
 
         shared_input_output = (
-            SharedFSUsage.INPUT_OUTPUT
-            in self.dag.workflow.storage_settings.shared_fs_usage
+            SharedFSUsage.INPUT_OUTPUT in workflow.storage_settings.shared_fs_usage
         )
         if (
-            self.dag.workflow.exec_mode == ExecMode.SUBPROCESS
+            workflow.exec_mode == ExecMode.SUBPROCESS
             or shared_input_output
-            or (self.dag.workflow.remote_exec and not shared_input_output)
+            or workflow.remote_exec
             or self.is_local
         ):
             if not error and handle_touch:
-                self.dag.handle_touch(self)
+                dag.handle_touch(self)
             if handle_log:
-                await self.dag.handle_log(self)
+                await dag.handle_log(self)
             if not error:
-                await self.dag.check_and_touch_output(
+                await dag.check_and_touch_output(
                     self,
-                    wait=self.dag.workflow.execution_settings.latency_wait,
+                    wait=workflow.execution_settings.latency_wait,
                     ignore_missing_output=ignore_missing_output,
                     wait_for_local=True,
                 )
-            self.dag.unshadow_output(self, only_log=error)
+            dag.unshadow_output(self, only_log=error)
             if not error:
-                await self.dag.handle_storage(self, store_in_storage=store_in_storage)
-                self.dag.handle_protected(self)
+                await dag.handle_storage(self, store_in_storage=store_in_storage)
+                dag.handle_protected(self)
+        persistence = workflow.persistence
         if not error:
             try:
-                await self.dag.workflow.persistence.finished(self)
+                await persistence.finished(self)
             except IOError as e:
                 raise WorkflowError(
                     "Error recording metadata for finished job "
                     "({}). Please ensure write permissions for the "
-                    "directory {}".format(e, self.dag.workflow.persistence.path)
+                    "directory {}".format(e, persistence.path)
                 )
 
-        if error and not self.dag.workflow.execution_settings.keep_incomplete:
+        if error and not workflow.execution_settings.keep_incomplete:
             await self.cleanup()
-            self.dag.workflow.persistence.cleanup(self)
+            persistence.cleanup(self)
 
     @property
     def name(self):
@@ -1076,12 +1205,13 @@ class Job(AbstractJob, SingleJobExecutorInterface):
         return self.dag.priority(self)
 
     def products(self, include_logfiles=True):
-        products = list(self.output)
-        if self.benchmark:
-            products.append(self.benchmark)
-        if include_logfiles:
-            products.extend(self.log)
-        return products
+        if self._products is None:
+            products = tuple(self.output)
+            if self.benchmark:
+                products += (self.benchmark,)
+            self._products = (products, products + tuple(self.log))
+        products, products_with_logs = self._products
+        return products_with_logs if include_logfiles else products
 
     @property
     def rules(self):
@@ -1126,6 +1256,12 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
         "_log",
         "_inputsize",
         "_all_products",
+        "_all_inputs",
+        "_wait_for_input_files",
+        "_is_local",
+        "_is_checkpoint",
+        "_is_containerized",
+        "_needs_singularity",
         "_attempt",
         "_toposorted",
         "_jobid",
@@ -1143,6 +1279,12 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
         self._log = None
         self._inputsize = None
         self._all_products = None
+        self._all_inputs = None
+        self._wait_for_input_files = None
+        self._is_local = None
+        self._is_checkpoint = None
+        self._is_containerized = None
+        self._needs_singularity = None
         self._attempt = self.dag.workflow.execution_settings.attempt
         self._jobid = None
 
@@ -1161,10 +1303,24 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
     @jobs.setter
     def jobs(self, new_jobs):
         self._jobs = new_jobs
+        # reset everything that is derived from the files of the jobs
+        self._input = None
+        self._output = None
+        self._log = None
+        self._all_products = None
+        self._all_inputs = None
+        self._wait_for_input_files = None
+        # reset everything that is derived from the rules of the jobs
+        self._is_local = None
+        self._is_checkpoint = None
+        self._is_containerized = None
+        self._needs_singularity = None
 
     @property
     def is_containerized(self):
-        return any(job.is_containerized for job in self.jobs)
+        if self._is_containerized is None:
+            self._is_containerized = any(job.is_containerized for job in self.jobs)
+        return self._is_containerized
 
     @property
     def toposorted(self):
@@ -1213,15 +1369,42 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
     def is_group(self):
         return True
 
+    def _collect_files(self):
+        """Collect input, output, log and products of the group in a single
+        traversal of its jobs."""
+        input, output, log = [], [], []
+        all_products = set()
+        for job in self.jobs:
+            input.extend(job.input)
+            output.extend(job.output)
+            log.extend(job.log)
+            all_products.update(job.products())
+        all_inputs = set(input)
+        # files produced and consumed within the group are neither
+        # input nor output of the group
+        self._input = [f for f in input if f not in all_products]
+        self._output = [f for f in output if f not in all_inputs]
+        self._log = log
+        self._all_products = all_products
+        self._all_inputs = all_inputs
+
     @property
     def all_products(self):
         if self._all_products is None:
-            self._all_products = set(f for job in self.jobs for f in job.products())
+            self._collect_files()
         return self._all_products
 
+    @property
+    def all_inputs(self):
+        if self._all_inputs is None:
+            self._collect_files()
+        return self._all_inputs
+
     @property
     def is_checkpoint(self):
-        return any(job.is_checkpoint for job in self.jobs)
+        if self._is_checkpoint is None:
+            self._is_checkpoint = any(job.is_checkpoint for job in self.jobs)
+        return self._is_checkpoint
 
     @property
     def is_updated(self):
@@ -1258,34 +1441,31 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
             job.reset_params_and_resources()
 
     def get_wait_for_files(self):
-        local_input = [
-            f
-            for job in self.jobs
-            for f in job.local_input
-            if f not in self.all_products
-        ]
-        remote_input = [
-            f
-            for job in self.jobs
-            for f in job.storage_input
-            if f not in self.all_products
-        ]
+        if self._wait_for_input_files is None:
+            all_products = self.all_products
+            local_input = [
+                f for job in self.jobs for f in job.local_input if f not in all_products
+            ]
+            remote_input = [
+                f
+                for job in self.jobs
+                for f in job.storage_input
+                if f not in all_products
+            ]
 
-        wait_for_files = []
-        wait_for_files.extend(local_input)
-        wait_for_files.extend(
-            f for f in remote_input if not f.should_not_be_retrieved_from_storage
-        )
+            self._wait_for_input_files = local_input + [
+                f for f in remote_input if not f.should_not_be_retrieved_from_storage
+            ]
+        wait_for_files = list(self._wait_for_input_files)
 
+        conda = (
+            DeploymentMethod.CONDA
+            in self.dag.workflow.deployment_settings.deployment_method
+        )
         for job in self.jobs:
             if job.shadow_dir:
                 wait_for_files.append(job.shadow_dir)
-            if (
-                DeploymentMethod.CONDA
-                in self.dag.workflow.deployment_settings.deployment_method
-                and job.conda_env
-                and not job.conda_env.is_named
-            ):
+            if conda and job.conda_env and not job.conda_env.is_named:
                 wait_for_files.append(job.conda_env.address)
         return wait_for_files
 
@@ -1293,7 +1473,7 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
     def resources(self):
         if self._resources is None:
             try:
-                self._resources = GroupResources.basic_layered(
+                resources = GroupResources.basic_layered(
                     toposorted_jobs=self.toposorted,
                     constraints=self.global_resources,
                     run_local=self.dag.workflow.local_exec,
@@ -1304,7 +1484,8 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
                 raise WorkflowError(
                     f"Error grouping resources in group '{self.groupid}': {err.args[0]}"
                 )
-        return Resources(fromdict=self._resources)
+            self._resources = Resources(fromdict=resources)
+        return self._resources
 
     @property
     def scheduler_resources(self):
@@ -1313,33 +1494,28 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
     @property
     def input(self):
         if self._input is None:
-            self._input = [
-                f for job in self.jobs for f in job.input if f not in self.all_products
-            ]
+            self._collect_files()
         return self._input
 
     @property
     def output(self):
-        all_input = set(f for job in self.jobs for f in job.input)
         if self._output is None:
-            self._output = [
-                f for job in self.jobs for f in job.output if f not in all_input
-            ]
+            self._collect_files()
         return self._output
 
     @property
     def log(self):
         if self._log is None:
-            self._log = [f for job in self.jobs for f in job.log]
+            self._collect_files()
         return self._log
 
     def products(self, include_logfiles=True):
-        all_input = set(f for job in self.jobs for f in job.input)
+        all_inputs = self.all_inputs
         return [
             f
             for job in self.jobs
             for f in job.products(include_logfiles=include_logfiles)
-            if f not in all_input
+            if f not in all_inputs
         ]
 
     def properties(self, omit_resources=["_cores", "_nodes"], **aux_properties):
@@ -1390,10 +1566,11 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
                     tg.create_task(job.postprocess(error=error, **kwargs))
         # remove all pipe and service outputs since all jobs of this group are done and the
         # outputs are no longer needed
-        for job in self.jobs:
-            for f in job.output:
-                if is_flagged(f, "pipe") or is_flagged(f, "service"):
-                    await f.remove()
+        async with asyncio.TaskGroup() as tg:
+            for job in self.jobs:
+                for f in job.output:
+                    if is_flagged(f, "pipe") or is_flagged(f, "service"):
+                        tg.create_task(f.remove())
 
     @property
     def name(self):
@@ -1405,7 +1582,7 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
 
     async def inputsize(self):
         if self._inputsize is None:
-            self._inputsize = sum([await f.size() for f in self.input])
+            self._inputsize = sum(await asyncio.gather(*(f.size() for f in self.input)))
         return self._inputsize
 
     @property
@@ -1414,37 +1591,39 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
 
     @property
     def is_local(self):
-        return any(job.is_local for job in self.jobs)
+        if self._is_local is None:
+            self._is_local = any(job.is_local for job in self.jobs)
+        return self._is_local
 
     def merged_wildcards(self):
         jobs = iter(self.jobs)
         merged_wildcards = Wildcards(toclone=next(jobs).wildcards)
+        names = set(merged_wildcards.keys())
         for job in jobs:
             for name, value in job.wildcards.items():
-                if name not in merged_wildcards.keys():
+                if name not in names:
+                    names.add(name)
                     merged_wildcards.append(value)
                     merged_wildcards._add_name(name)
         return merged_wildcards
 
     def format_wildcards(self, string, **variables):
         """Format a string with variables from the job."""
-
-        _variables = dict()
-        _variables.update(self.dag.workflow.globals)
-        _variables.update(
-            dict(
-                input=self.input,
-                output=self.output,
-                threads=self.threads,
-                wildcards=self.merged_wildcards(),
-                jobid=self.jobid,
-                name=self.name,
-                rule="GROUP",
-                rulename="GROUP",
-                resources=self.resources,
-            )
-        )
-        _variables.update(variables)
+        if not has_format_fields(string):
+            return string
+        _variables = {
+            **self.dag.workflow.globals,
+            "input": self.input,
+            "output": self.output,
+            "threads": self.threads,
+            "wildcards": self.merged_wildcards(),
+            "jobid": self.jobid,
+            "name": self.name,
+            "rule": "GROUP",
+            "rulename": "GROUP",
+            "resources": self.resources,
+            **variables,
+        }
         try:
             return format(string, **_variables)
         except NameError as ex:
@@ -1477,7 +1656,9 @@ class GroupJob(AbstractJob, GroupJobExecutorInterface):
 
     @property
     def needs_singularity(self):
-        return any(job.needs_singularity for job in self.jobs)
+        if self._needs_singularity is None:
+            self._needs_singularity = any(job.needs_singularity for job in self.jobs)
+        return self._needs_singularity
 
     @property
     def rules(self):
@@ -1524,7 +1705,6 @@ class Reason:
         "derived",
         "pipe",
         "service",
-        "target",
         "finished",
         "cleanup_metadata_instructions",
     ]
@@ -1562,21 +1742,29 @@ class Reason:
             or self.input_changed
         )
 
-    @lazy_property
+    @property
     def updated_input(self):
-        return set()
+        if self._updated_input is None:
+            self._updated_input = set()
+        return self._updated_input
 
-    @lazy_property
+    @property
     def updated_input_run(self):
-        return set()
+        if self._updated_input_run is None:
+            self._updated_input_run = set()
+        return self._updated_input_run
 
-    @lazy_property
+    @property
     def missing_output(self):
-        return set()
+        if self._missing_output is None:
+            self._missing_output = set()
+        return self._missing_output
 
-    @lazy_property
+    @property
     def incomplete_output(self):
-        return set()
+        if self._incomplete_output is None:
+            self._incomplete_output = set()
+        return self._incomplete_output
 
     def mark_finished(self):
         "called if the job has been run"
@@ -1671,11 +1859,10 @@ class Reason:
         return s
 
     def __bool__(self):
-        v = bool(
-            self.updated_input
-            or self.missing_output
-            or self.forced
-            or self.updated_input_run
+        # Check the plain flags first and access the file sets via their
+        # underlying attributes in order to not allocate them as a side effect.
+        return not self.finished and bool(
+            self.forced
             or self.noio
             or self.nooutput
             or self.pipe
@@ -1684,5 +1871,7 @@ class Reason:
             or self.params_changed
             or self.software_stack_changed
             or self.input_changed
+            or self._updated_input
+            or self._missing_output
+            or self._updated_input_run
         )
-        return v and not self.finished
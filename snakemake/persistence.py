@@ -287,11 +287,18 @@ class Persistence(PersistenceExecutorInterface):
         shellcmd = job.shellcmd
         conda_env = self._conda_env(job)
         fallback_time = time.time()
+        # input checksums are the same for all output files of the job
+        input_checksums = {
+            infile: checksum
+            for infile in job.input
+            if (checksum := await infile.checksum()) is not None
+        }
         for f in job.output:
             rec_path = self._record_path(self._incomplete_path, f)
-            starttime = os.path.getmtime(rec_path) if os.path.exists(rec_path) else None
-            # Sometimes finished is called twice, if so, lookup the previous starttime
-            if not os.path.exists(rec_path):
+            if os.path.exists(rec_path):
+                starttime = os.path.getmtime(rec_path)
+            else:
+                # Sometimes finished is called twice, if so, lookup the previous starttime
                 starttime = self._read_record(self._metadata_path, f).get(
                     "starttime", None
                 )
@@ -302,8 +309,6 @@ class Persistence(PersistenceExecutorInterface):
                 else fallback_time
             )
 
-            checksums = ((infile, await infile.checksum()) for infile in job.input)
-
             self._record(
                 self._metadata_path,
                 {
@@ -319,11 +324,7 @@ class Persistence(PersistenceExecutorInterface):
                     "job_hash": hash(job),
                     "conda_env": conda_env,
                     "container_img_url": job.container_img_url,
-                    "input_checksums": {
-                        infile: checksum
-                        async for infile, checksum in checksums
-                        if checksum is not None
-                    },
+                    "input_checksums": input_checksums,
                 },
                 f,
             )
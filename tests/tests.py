@@ -372,6 +372,30 @@ def test_shadow_copy():
     run(dpath("test_shadow_copy"))
 
 
+@skip_on_windows
+def test_shadow_copy_fallback(tmp_path, monkeypatch):
+    import errno
+    from snakemake.jobs import copy_file
+
+    def copy_file_range_error(*args, **kwargs):
+        raise OSError(errno.EPERM, "Operation not permitted")
+
+    def copy_file_range_nothing(*args, **kwargs):
+        return 0
+
+    src = tmp_path / "src.txt"
+    src.write_text("shadow")
+    src.chmod(0o750)
+    for i, copy_file_range in enumerate(
+        [copy_file_range_error, copy_file_range_nothing]
+    ):
+        monkeypatch.setattr(os, "copy_file_range", copy_file_range, raising=False)
+        dst = tmp_path / f"dst{i}.txt"
+        copy_file(src, dst)
+        assert dst.read_text() == "shadow"
+        assert dst.stat().st_mode & 0o777 == 0o750
+
+
 @skip_on_windows  # Symbolic link privileges needed to work
 def test_shadow_prefix():
     run(dpath("test_shadow_prefix"), shadow_prefix="shadowdir")